@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 # battery_daemon.py
 # Minimal, robust battery notifier daemon.
-# - No dependencias externas (usa stdlib).
+# - No dependencias externas (usa stdlib); jeepney opcional para D-Bus directo.
 # - Notificaciones: notify-send, sonido (paplay/canberra/aplay/bell), Telegram (HTTP).
 # - Configurable vía .env file or variables de entorno.
-# - Lightweight daemon loop, handles SIGINT/SIGTERM cleanly.
+# - Lightweight daemon loop, handles SIGINT/SIGTERM cleanly (SIGHUP rescans batteries).
 # - Avoids repeated notifications until battery re-enters neutral range.
 
 from __future__ import annotations
@@ -14,12 +14,30 @@ import time
 import signal
 import errno
 import shutil
-import subprocess
 import logging
-from typing import List, Tuple, Optional, Dict
-from urllib import request, parse
+import re
+import socket
+import ssl
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Tuple, Optional, Dict, Mapping
+import http.client
+import base64
+from urllib import parse, request
 import json
 
+try:
+    # Optional: talk to the notification daemon over D-Bus without forking notify-send
+    from jeepney import DBusAddress, new_method_call
+    from jeepney.io.blocking import open_dbus_connection
+    from jeepney.wrappers import unwrap_msg
+    NOTIFICATIONS = DBusAddress("/org/freedesktop/Notifications",
+                                bus_name="org.freedesktop.Notifications",
+                                interface="org.freedesktop.Notifications")
+except ImportError:
+    open_dbus_connection = None
+
 # -----------------------
 # Defaults & paths
 # -----------------------
@@ -37,41 +55,66 @@ PIDFILE = os.path.join(DEFAULT_STATE_DIR, "pid")
 # -----------------------
 # Simple env loader
 # -----------------------
+# KEY=value per line; comment lines (#...) and lines without "=" never match
+ENV_LINE = re.compile(rb"^[ \t]*([^#\s=][^=\r\n]*?)[ \t]*=[ \t]*([^\r\n]*?)[ \t\r]*$", re.M)
+
 def load_env_file(path: str) -> Dict[str, str]:
     env: Dict[str, str] = {}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                if "=" not in line:
-                    continue
-                k, v = line.split("=", 1)
-                k = k.strip()
-                v = v.strip().strip('"').strip("'")
-                env[k] = v
+        with open(path, "rb") as f:
+            data = f.read()
     except FileNotFoundError:
-        pass
+        return env
+    # text mode used to accept \r\n and bare \r line endings; ENV_LINE only splits on \n
+    data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    for k, v in ENV_LINE.findall(data):
+        env[k.decode("utf-8")] = v.decode("utf-8").strip('"').strip("'")
     return env
 
 # -----------------------
 # Configuration
 # -----------------------
-def load_config(env_path: Optional[str]) -> Dict[str, str]:
-    cfg = dict(os.environ)  # base from environment
-    if env_path:
-        cfg.update(load_env_file(env_path))
-    # fallback defaults
-    cfg.setdefault("HIGH", "80")
-    cfg.setdefault("LOW", "20")
-    cfg.setdefault("POLL_INTERVAL", "60")
-    cfg.setdefault("STATE_DIR", DEFAULT_STATE_DIR)
-    cfg.setdefault("LOGFILE", DEFAULT_LOGFILE)
+DEFAULTS: Dict[str, str] = {
+    "HIGH": "80",
+    "LOW": "20",
+    "POLL_INTERVAL": "60",
+    "STATE_DIR": DEFAULT_STATE_DIR,
+    "LOGFILE": DEFAULT_LOGFILE,
     # Telegram optional
-    cfg.setdefault("TELEGRAM_BOT_TOKEN", "")
-    cfg.setdefault("TELEGRAM_CHAT_ID", "")
-    return cfg
+    "TELEGRAM_BOT_TOKEN": "",
+    "TELEGRAM_CHAT_ID": "",
+}
+
+def load_config(env_path: Optional[str]) -> ChainMap:
+    """
+    Lookup order: .env file > process environment > DEFAULTS.
+    Nothing is copied; writes (e.g. --poll override) land in the .env layer.
+    """
+    env_file = load_env_file(env_path) if env_path else {}
+    return ChainMap(env_file, os.environ, DEFAULTS)
+
+@dataclass(frozen=True)
+class RuntimeCfg:
+    """Config values the daemon uses on every tick, parsed once at startup."""
+    low: int
+    high: int
+    poll: int
+    chat: str
+    state_dir: str
+    state_file: str
+    tg_path: str  # Telegram sendMessage path ("" when no token is configured)
+
+def runtime_config(cfg: Mapping[str, str]) -> RuntimeCfg:
+    token = cfg["TELEGRAM_BOT_TOKEN"]
+    return RuntimeCfg(
+        low=int(cfg["LOW"]),
+        high=int(cfg["HIGH"]),
+        poll=int(cfg["POLL_INTERVAL"]),
+        chat=cfg["TELEGRAM_CHAT_ID"],
+        state_dir=cfg["STATE_DIR"],
+        state_file=os.path.join(cfg["STATE_DIR"], "state"),
+        tg_path=f"/bot{token}/sendMessage" if token else "",
+    )
 
 # -----------------------
 # Logging
@@ -92,73 +135,183 @@ def setup_logging(path: str, verbose: bool = False):
 # Battery discovery & reading (handles multiple batteries)
 # Weighted by energy_full/charge_full when available for accuracy.
 # -----------------------
+POWER_SUPPLY_DIR = "/sys/class/power_supply"
+
 def find_battery_paths() -> List[str]:
-    base = "/sys/class/power_supply"
-    if not os.path.isdir(base):
+    base = POWER_SUPPLY_DIR
+    try:
+        dfd = os.open(base, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+    except OSError:
         return []
-    bats = []
-    for entry in os.listdir(base):
-        p = os.path.join(base, entry)
-        # must have capacity file
-        if os.path.isdir(p) and os.path.exists(os.path.join(p, "capacity")):
-            bats.append(p)
-    return bats
-
-def read_int_file(path: str) -> Optional[int]:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return int(f.read().strip())
+        # One getdents pass via scandir, then one faccessat() per entry: "<entry>/capacity"
+        # existing proves both that it is a (symlinked) device dir and that it is a battery.
+        # Entries are symlinks, so DirEntry.is_dir(follow_symlinks=False) would reject them all.
+        with os.scandir(dfd) as it:
+            return [os.path.join(base, e.name) for e in it
+                    if os.access(e.name + "/capacity", os.F_OK, dir_fd=dfd)]
+    finally:
+        os.close(dfd)
+
+class BatteryReader:
+    """
+    Keeps one read-only fd per sysfs attribute open for the life of the daemon.
+    Each poll only needs one pread() per attribute instead of a full open/read/close.
+    """
+    # key -> candidate sysfs attributes, in preference order. Like the old
+    # read(energy_now) or read(charge_now), a later candidate is only read when
+    # the earlier ones are missing, unreadable or 0; normally that is one read per key.
+    SOURCES = (
+        ("now", ("energy_now", "charge_now")),
+        ("full", ("energy_full", "charge_full")),
+        ("capacity", ("capacity",)),
+        ("status", ("status",)),
+    )
+    # fallback-only keys: skipped by read_all(), fetched with read() when needed
+    LAZY = ("capacity",)
+    # errno values meaning the power_supply device itself went away (hot-swap, driver re-register)
+    GONE_ERRNOS = (errno.ENODEV, errno.ENOENT)
+
+    def __init__(self, paths: List[str]):
+        self.paths = paths
+        # set when a read hits GONE_ERRNOS; the cached fds are then useless and
+        # daemon_loop rebuilds the reader on its next tick
+        self.stale = False
+        self.fds: Dict[str, Dict[str, int]] = {}
+        for p in paths:
+            fds: Dict[str, int] = {}
+            for key, candidates in self.SOURCES:
+                for name in candidates:
+                    try:
+                        fds[name] = os.open(os.path.join(p, name), os.O_RDONLY | os.O_CLOEXEC)
+                    except OSError:
+                        # attribute not exposed by this driver
+                        continue
+            self.fds[p] = fds
+
+    @staticmethod
+    def read_attr(fd: int) -> bytes:
+        # pread at offset 0: one syscall, no lseek needed to rewind the attribute.
+        # Every attribute we read (integers, status word) fits in 32 bytes.
+        return os.pread(fd, 32, 0)
+
+    def read_fd(self, fd: int) -> Optional[bytes]:
+        try:
+            return self.read_attr(fd)
+        except OSError as e:
+            if e.errno in self.GONE_ERRNOS:
+                self.stale = True
+            return None
+
+    def read(self, p: str, key: str) -> Optional[bytes]:
+        fds = self.fds.get(p, {})
+        candidates = dict(self.SOURCES)[key]
+        for name in candidates:
+            fd = fds.get(name)
+            if fd is None:
+                continue
+            buf = self.read_fd(fd)
+            if buf is None:
+                continue
+            # single-source keys return whatever was read; alternatives need a non-zero value
+            if len(candidates) == 1 or parse_int(buf):
+                return buf
+        return None
+
+    def read_all(self) -> Dict[str, Dict[str, bytes]]:
+        """
+        Reads every non-LAZY key in a single pass.
+        Returns {battery_path: {key: raw_bytes}}; unreadable attributes are omitted
+        (check .stale afterwards to tell a vanished device from a missing value).
+        """
+        snapshot: Dict[str, Dict[str, bytes]] = {}
+        for p in self.fds:
+            values: Dict[str, bytes] = {}
+            for key, _ in self.SOURCES:
+                if key in self.LAZY:
+                    continue
+                buf = self.read(p, key)
+                if buf is not None:
+                    values[key] = buf
+            snapshot[p] = values
+        return snapshot
+
+    def close(self):
+        for fds in self.fds.values():
+            for fd in fds.values():
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.fds = {}
+
+# Raw sysfs status payloads mapped straight to their names, so the common
+# case needs neither a decode nor a strip.
+STATUS_NAMES = {
+    b"Charging\n": "Charging",
+    b"Discharging\n": "Discharging",
+    b"Full\n": "Full",
+    b"Not charging\n": "Not charging",
+    b"Unknown\n": "Unknown",
+}
+
+def parse_int(buf: Optional[bytes]) -> Optional[int]:
+    # int() accepts bytes and ignores the trailing newline: no str round-trip
+    try:
+        return int(buf)
     except Exception:
         return None
 
-def read_float_file(path: str) -> Optional[float]:
+def parse_status(buf: Optional[bytes]) -> Optional[str]:
+    if buf is None:
+        return None
+    name = STATUS_NAMES.get(buf)
+    if name is not None:
+        return name
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return float(f.read().strip())
+        return buf.decode("utf-8").strip()
     except Exception:
         return None
 
-def battery_info() -> Tuple[int, str]:
+def battery_info(reader: Optional[BatteryReader] = None) -> Tuple[int, str]:
     """
     Returns (percentage:int 0..100, status:str)
     Status values: Charging, Discharging, Full, Unknown
+    Without a reader, a temporary one is built (and closed) for this call.
     """
-    paths = find_battery_paths()
-    if not paths:
-        raise RuntimeError("No battery devices found under /sys/class/power_supply")
+    if reader is None:
+        reader = BatteryReader(find_battery_paths())
+        try:
+            return battery_info(reader)
+        finally:
+            reader.close()
+    if not reader.paths:
+        raise RuntimeError(f"No battery devices found under {POWER_SUPPLY_DIR}")
 
     total_energy = 0.0
     total_capacity_weight = 0.0
     statuses = []
     capacities = []
 
-    for p in paths:
-        # Try to get best measurement: energy_now/energy_full or charge_now/charge_full
-        energy_now = read_float_file(os.path.join(p, "energy_now")) or read_float_file(os.path.join(p, "charge_now"))
-        energy_full = read_float_file(os.path.join(p, "energy_full")) or read_float_file(os.path.join(p, "charge_full"))
-        capacity = read_int_file(os.path.join(p, "capacity"))  # fallback percentage
-        status = None
-        for fn in ("status",):
-            s = None
-            try:
-                with open(os.path.join(p, fn), "r", encoding="utf-8") as f:
-                    s = f.read().strip()
-            except Exception:
-                s = None
-            if s:
-                status = s
-                break
+    snapshot = reader.read_all()
+    for p in reader.paths:
+        attrs = snapshot.get(p, {})
+        # Best measurement: energy_now/energy_full or charge_now/charge_full (fallback done by the reader).
+        # sysfs reports both as integers (uWh / uAh); only the ratio below is a float.
+        energy_now = parse_int(attrs.get("now"))
+        energy_full = parse_int(attrs.get("full"))
+        status = parse_status(attrs.get("status"))
         if status:
             statuses.append(status)
         if energy_now is not None and energy_full:
             # weighted by energy_full
-            try:
-                pct = (energy_now / energy_full) * 100.0
-            except Exception:
-                pct = float(capacity) if capacity is not None else 0.0
+            pct = (energy_now / energy_full) * 100.0
             total_energy += pct * (energy_full)
             total_capacity_weight += energy_full
-        elif capacity is not None:
+            continue
+        # capacity is only read when there is no usable energy/charge pair
+        capacity = parse_int(reader.read(p, "capacity"))  # fallback percentage
+        if capacity is not None:
             # fallback to capacity with weight 1
             capacities.append(capacity)
             total_energy += capacity
@@ -168,6 +321,10 @@ def battery_info() -> Tuple[int, str]:
             total_energy += 0.0
             total_capacity_weight += 1.0
 
+    if reader.stale:
+        # a device vanished mid-read: don't report a bogus (0-weighted) percentage
+        raise RuntimeError("Battery device disappeared; rescanning on next poll")
+
     overall_pct = 0
     if total_capacity_weight > 0:
         overall_pct = int(round(total_energy / total_capacity_weight))
@@ -191,41 +348,143 @@ def battery_info() -> Tuple[int, str]:
 # -----------------------
 # Notifications (popup, sound, telegram)
 # -----------------------
-def notify_send(message: str) -> bool:
+_dbus_conn = None
+
+# prefer paplay, then canberra-gtk-play, then aplay, then bell
+SOUND_CANDIDATES = [
+    (["paplay", "/usr/share/sounds/freedesktop/stereo/complete.oga"], "paplay"),
+    (["canberra-gtk-play", "-f", "/usr/share/sounds/freedesktop/stereo/complete.oga"], "canberra-gtk-play"),
+    (["aplay", "/usr/share/sounds/alsa/Front_Center.wav"], "aplay"),
+]
+# Resolved once by setup_notifiers(); None means "not installed"
+NOTIFY_BIN: Optional[str] = None
+SOUND_CMD: Optional[List[str]] = None
+_devnull_fd: Optional[int] = None
+_notify_pool: Optional[ThreadPoolExecutor] = None
+
+def ensure_session_bus_env():
     # Try to find DBUS session bus address
-    bus = os.getenv("DBUS_SESSION_BUS_ADDRESS")
-    if not bus:
+    if not os.getenv("DBUS_SESSION_BUS_ADDRESS"):
         # try default path for user session
         candidate = f"unix:path=/run/user/{os.getuid()}/bus"
         if os.path.exists(f"/run/user/{os.getuid()}/bus"):
             os.environ["DBUS_SESSION_BUS_ADDRESS"] = candidate
+
+def setup_notifiers(rc: RuntimeCfg):
+    """
+    Resolves notify-send and the sound player once, pre-opens /dev/null for their
+    output, pre-resolves the Telegram API host (when configured) and opens the
+    persistent D-Bus session connection (if jeepney is available).
+    """
+    global _dbus_conn, NOTIFY_BIN, SOUND_CMD, _devnull_fd, _notify_pool, _tg_client
+    NOTIFY_BIN = shutil.which("notify-send")
+    SOUND_CMD = None
+    for cmd, name in SOUND_CANDIDATES:
+        path = shutil.which(cmd[0])
+        if path:
+            SOUND_CMD = [path] + cmd[1:]
+            break
+    logging.debug("notify-send: %s, sound: %s", NOTIFY_BIN, SOUND_CMD and SOUND_CMD[0])
+    if _devnull_fd is None:
+        _devnull_fd = os.open(os.devnull, os.O_WRONLY | os.O_CLOEXEC)
+    if _notify_pool is None:
+        # Workers start lazily on first submit, i.e. from daemon_loop after it has
+        # blocked DAEMON_SIGNALS, so they inherit the mask and never steal a signal.
+        _notify_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="notify")
+    if rc.tg_path and rc.chat and _tg_client is None:
+        _tg_client = TGClient(rc.tg_path, rc.chat, proxy=telegram_proxy())
+        if _tg_client.proxy:
+            # the proxy resolves the API host; nothing to pre-resolve here
+            logging.debug("telegram via HTTPS proxy")
+        else:
+            try:
+                _tg_client.resolve()
+            except OSError as e:
+                # network may not be up yet at boot; resolved lazily on first send
+                logging.debug("telegram DNS pre-resolve failed: %s", e)
+
+    ensure_session_bus_env()
+    if open_dbus_connection is None:
+        logging.debug("jeepney not installed; using notify-send")
+        return
     try:
-        subprocess.run(["notify-send", "Battery Guardian", message], check=False)
-        logging.debug("notify-send attempted")
+        _dbus_conn = open_dbus_connection(bus="SESSION")
+        logging.debug("D-Bus session connection opened")
+    except Exception as e:
+        logging.debug("D-Bus session bus unavailable, using notify-send: %s", e)
+
+def spawn_wait(argv: List[str], quiet: bool = False) -> int:
+    """
+    posix_spawn()s argv[0] (an absolute path) and waits for it. glibc implements
+    posix_spawn with vfork semantics, so no page tables are copied as with fork().
+    quiet: send stdout/stderr to the pre-opened /dev/null.
+    """
+    file_actions = None
+    if quiet and _devnull_fd is not None:
+        file_actions = [(os.POSIX_SPAWN_DUP2, _devnull_fd, 1), (os.POSIX_SPAWN_DUP2, _devnull_fd, 2)]
+    pid = os.posix_spawn(argv[0], argv, os.environ, file_actions=file_actions)
+    _, status = os.waitpid(pid, 0)
+    return status
+
+def close_dbus():
+    global _dbus_conn
+    if _dbus_conn is not None:
+        try:
+            _dbus_conn.close()
+        except Exception:
+            pass
+        _dbus_conn = None
+
+def close_notifiers():
+    global _devnull_fd, _notify_pool
+    if _notify_pool is not None:
+        _notify_pool.shutdown(wait=True)
+        _notify_pool = None
+    close_dbus()
+    close_telegram()
+    if _devnull_fd is not None:
+        os.close(_devnull_fd)
+        _devnull_fd = None
+
+def notify_dbus(message: str) -> bool:
+    if _dbus_conn is None:
+        return False
+    # app_name, replaces_id, app_icon, summary, body, actions, hints, expire_timeout
+    msg = new_method_call(NOTIFICATIONS, "Notify", "susssasa{sv}i",
+                          ("Battery Guardian", 0, "", "Battery Guardian", message, [], {}, -1))
+    try:
+        unwrap_msg(_dbus_conn.send_and_get_reply(msg, timeout=5))
+        logging.debug("D-Bus notification sent")
         return True
-    except FileNotFoundError:
+    except Exception as e:
+        # connection is likely stale (session ended); drop it and fall back to notify-send
+        logging.debug("D-Bus notify error: %s", e)
+        close_dbus()
+        return False
+
+def notify_send(message: str) -> bool:
+    if notify_dbus(message):
+        return True
+    if NOTIFY_BIN is None:
         logging.debug("notify-send not found")
         return False
+    ensure_session_bus_env()
+    try:
+        spawn_wait([NOTIFY_BIN, "Battery Guardian", message])
+        logging.debug("notify-send attempted")
+        return True
     except Exception as e:
         logging.debug("notify-send error: %s", e)
         return False
 
 def notify_sound() -> bool:
-    # prefer paplay, then canberra-gtk-play, then aplay, then bell
-    sounds = [
-        (["paplay", "/usr/share/sounds/freedesktop/stereo/complete.oga"], "paplay"),
-        (["canberra-gtk-play", "-f", "/usr/share/sounds/freedesktop/stereo/complete.oga"], "canberra-gtk-play"),
-        (["aplay", "/usr/share/sounds/alsa/Front_Center.wav"], "aplay"),
-    ]
-    for cmd, name in sounds:
+    if SOUND_CMD is not None:
         try:
-            subprocess.run(cmd, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            logging.debug("sound attempted with %s", name)
+            spawn_wait(SOUND_CMD, quiet=True)
+            logging.debug("sound attempted with %s", SOUND_CMD[0])
             return True
-        except FileNotFoundError:
-            continue
-        except Exception:
-            continue
+        except Exception as e:
+            logging.debug("sound player error: %s", e)
     # fallback: terminal bell
     try:
         sys.stdout.write("\a")
@@ -235,29 +494,186 @@ def notify_sound() -> bool:
     except Exception:
         return False
 
-def notify_telegram(token: str, chat_id: str, text: str) -> bool:
-    if not token or not chat_id:
-        return False
-    api = f"https://api.telegram.org/bot{token}/sendMessage"
-    data = {"chat_id": chat_id, "text": text}
-    try:
-        data_encoded = parse.urlencode(data).encode()
-        req = request.Request(api, data=data_encoded, method="POST")
-        with request.urlopen(req, timeout=6) as resp:
-            body = resp.read()
+TELEGRAM_HOST = "api.telegram.org"
+
+class TelegramConnection(http.client.HTTPSConnection):
+    """
+    HTTPSConnection that dials already-resolved addresses (no DNS lookup per
+    reconnect) and offers the previous TLS session for abbreviated resumption.
+    With a tunnel set (set_tunnel(), proxy in use) the stock connect() is used.
+    """
+    def __init__(self, host: str, addrinfo: list, context: ssl.SSLContext,
+                 session: Optional[ssl.SSLSession], timeout: float, port: Optional[int] = None):
+        super().__init__(host, port, timeout=timeout, context=context)
+        self.addrinfo = addrinfo
+        self.tls_context = context
+        self.tls_session = session
+
+    def connect(self):
+        if self._tunnel_host:
+            # via an HTTPS proxy: let http.client dial the proxy and CONNECT through it
+            super().connect()
+            return
+        sock = None
+        last_error: Optional[OSError] = None
+        for family, type_, proto, _, sockaddr in self.addrinfo:
+            try:
+                sock = socket.socket(family, type_, proto)
+                sock.settimeout(self.timeout)
+                sock.connect(sockaddr)
+                break
+            except OSError as e:
+                last_error = e
+                if sock is not None:
+                    sock.close()
+                sock = None
+        if sock is None:
+            raise last_error or OSError(f"no address for {self.host}")
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = self.tls_context.wrap_socket(sock, server_hostname=self.host, session=self.tls_session)
+
+def telegram_proxy() -> Optional[str]:
+    """
+    HTTPS proxy from the environment (https_proxy/HTTPS_PROXY), honouring no_proxy,
+    i.e. what urllib's ProxyHandler would have used for the API host.
+    """
+    proxy = request.getproxies().get("https")
+    if not proxy or request.proxy_bypass(TELEGRAM_HOST):
+        return None
+    return proxy
+
+class TGClient:
+    """
+    Persistent Telegram Bot API client for one bot/chat: one keep-alive HTTPS
+    connection, cached getaddrinfo() result and resumable TLS session.
+    path: /bot<token>/sendMessage (see RuntimeCfg.tg_path).
+    proxy: optional http://[user:pass@]host[:port] proxy, tunnelled with CONNECT.
+    """
+    def __init__(self, path: str, chat_id: str, host: str = TELEGRAM_HOST, timeout: float = 6,
+                 proxy: Optional[str] = None):
+        self.path = path
+        self.chat_id = chat_id
+        self.host = host
+        self.timeout = timeout
+        self.proxy = proxy
+        self.context = ssl.create_default_context()
+        self.session: Optional[ssl.SSLSession] = None
+        self.addrinfo: Optional[list] = None
+        self.conn: Optional[TelegramConnection] = None
+
+    def resolve(self):
+        self.addrinfo = socket.getaddrinfo(self.host, 443, type=socket.SOCK_STREAM)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def connection(self) -> TelegramConnection:
+        if self.proxy:
+            u = parse.urlsplit(self.proxy if "://" in self.proxy else "http://" + self.proxy)
+            conn = TelegramConnection(u.hostname, [], self.context, None, self.timeout, port=u.port or 80)
+            headers = {}
+            if u.username:
+                creds = f"{parse.unquote(u.username)}:{parse.unquote(u.password or '')}"
+                headers["Proxy-Authorization"] = "Basic " + base64.b64encode(creds.encode()).decode("ascii")
+            conn.set_tunnel(self.host, 443, headers=headers)
+            return conn
+        if self.addrinfo is None:
+            self.resolve()
+        return TelegramConnection(self.host, self.addrinfo, self.context, self.session, self.timeout)
+
+    def post(self, body: bytes) -> Tuple[int, bytes]:
+        if self.conn is None:
+            self.conn = self.connection()
+        self.conn.request("POST", self.path, body=body, headers={
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Connection": "keep-alive",
+        })
+        resp = self.conn.getresponse()
+        data = resp.read()
+        # TLS 1.3 tickets arrive after the handshake; grab the session once data has flowed
+        if self.conn.sock is not None:
+            self.session = self.conn.sock.session
+        return resp.status, data
+
+    def send(self, text: str, retries: int = 2) -> bool:
+        """
+        retries: extra attempts on the same keep-alive socket after a 5xx reply.
+        A dead socket is rebuilt once from the cached address and TLS session; if
+        that fails too, the host is resolved again and one last attempt is made.
+        """
+        body = parse.urlencode({"chat_id": self.chat_id, "text": text}).encode()
+        reconnects = 0
+        server_retries = 0
+        while True:
+            try:
+                status, data = self.post(body)
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                if reconnects == 0:
+                    # socket is dead (idle timeout, network change)
+                    logging.debug("telegram connection dropped (%s), reconnecting", e)
+                elif reconnects == 1:
+                    # cached address may be stale: resolve again before giving up on this alert
+                    logging.debug("telegram reconnect failed (%s), resolving %s again", e, self.host)
+                    self.addrinfo = None
+                else:
+                    logging.debug("telegram send failed: %s", e)
+                    return False
+                reconnects += 1
+                continue
             # quick sanity check
             try:
-                j = json.loads(body.decode("utf-8"))
-                ok = j.get("ok", False)
-                logging.debug("telegram response ok=%s", ok)
-                return bool(ok)
+                ok = bool(json.loads(data.decode("utf-8")).get("ok", False))
             except Exception:
-                logging.debug("telegram raw response: %s", body)
+                logging.debug("telegram raw response: %s", data)
                 return True
+            logging.debug("telegram response status=%s ok=%s", status, ok)
+            if ok or status < 500 or server_retries >= retries:
+                return ok
+            # server-side error: retry on the same keep-alive socket
+            server_retries += 1
+
+_tg_client: Optional[TGClient] = None
+
+def close_telegram():
+    if _tg_client is not None:
+        _tg_client.close()
+
+def notify_telegram(text: str) -> bool:
+    # client only exists when token and chat id are configured (see setup_notifiers)
+    if _tg_client is None:
+        return False
+    try:
+        return _tg_client.send(text)
     except Exception as e:
+        # don't reuse a connection left in an unknown state
+        _tg_client.close()
         logging.debug("telegram send failed: %s", e)
         return False
 
+def notify_all(rc: RuntimeCfg, message: str):
+    """
+    Fans the message out to popup, sound and Telegram concurrently, so the
+    slow Telegram round-trip overlaps the local notifiers. Returns once all finish.
+    """
+    jobs = [
+        (notify_send, (message,)),
+        (notify_sound, ()),
+        (notify_telegram, (message,)),
+    ]
+    if _notify_pool is None:
+        for fn, args in jobs:
+            fn(*args)
+        return
+    futures = [_notify_pool.submit(fn, *args) for fn, args in jobs]
+    for f in futures:
+        try:
+            f.result()
+        except Exception as e:
+            logging.debug("notifier error: %s", e)
+
 # -----------------------
 # State handling
 # -----------------------
@@ -282,29 +698,47 @@ def clear_state(path: str):
     except Exception:
         pass
 
+class StateTracker:
+    """
+    In-memory copy of the state file: read once at startup, and the file is
+    only touched (write_state/clear_state) when the state actually changes.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.value = read_state(path)
+
+    def set(self, value: str):
+        if value == self.value:
+            return
+        if value == "none":
+            clear_state(self.path)
+        else:
+            write_state(self.path, value)
+        self.value = value
+
 # -----------------------
 # Daemon & CLI
 # -----------------------
-RUNNING = True
-
-def handle_signal(signum, frame):
-    global RUNNING
-    logging.info("Signal %s received, shutting down.", signum)
-    RUNNING = False
-
-signal.signal(signal.SIGINT, handle_signal)
-signal.signal(signal.SIGTERM, handle_signal)
-
-def one_iteration(cfg: Dict[str, str], force: Optional[str] = None):
+# Signals are blocked in daemon mode and consumed synchronously by sigtimedwait(),
+# so the loop sleeps in the kernel for a whole interval instead of waking every second.
+DAEMON_SIGNALS = {signal.SIGINT, signal.SIGTERM, signal.SIGHUP}
+
+def open_battery_reader(previous: Optional[List[str]] = None) -> BatteryReader:
+    reader = BatteryReader(find_battery_paths())
+    # only log when the set changed, so the per-tick retry while no battery is registered stays quiet
+    if reader.paths != previous:
+        logging.info("Batteries: %s", ", ".join(reader.paths) or "none")
+    return reader
+
+def one_iteration(rc: RuntimeCfg, force: Optional[str] = None, reader: Optional[BatteryReader] = None,
+                  tracker: Optional[StateTracker] = None):
     """
     Performs one read and maybe-notify action.
     force: None | "force-high" | "force-low"
+    reader: cached sysfs handles (daemon mode); built per call when omitted.
+    tracker: in-memory state kept across daemon ticks; loaded from disk when omitted.
     """
-    low = int(cfg.get("LOW", "20"))
-    high = int(cfg.get("HIGH", "80"))
-    token = cfg.get("TELEGRAM_BOT_TOKEN", "")
-    chat = cfg.get("TELEGRAM_CHAT_ID", "")
-    state_file = os.path.join(cfg.get("STATE_DIR"), "state")
+    low, high = rc.low, rc.high
     try:
         if force == "force-high":
             pct, status = high, "Charging"
@@ -313,31 +747,33 @@ def one_iteration(cfg: Dict[str, str], force: Optional[str] = None):
             pct, status = low, "Discharging"
             logging.info("Forced low test: %s%% %s", pct, status)
         else:
-            pct, status = battery_info()
+            pct, status = battery_info(reader)
             logging.info("Battery %d%% - %s", pct, status)
     except Exception as e:
         logging.error("Failed reading battery info: %s", e)
         return
 
-    current_state = read_state(state_file)
+    if tracker is None:
+        tracker = StateTracker(rc.state_file)
+    current_state = tracker.value
+
+    # Fast path: neutral range with state already cleared -> nothing to do
+    if low < pct < high and current_state == "none":
+        return
 
     if status == "Charging" and pct >= high:
         if current_state != "notified_high":
             msg = f"Batería en {pct}% — desconecta el cargador (objetivo: {high}%)."
-            notify_send(msg)
-            notify_sound()
-            notify_telegram(token, chat, msg)
-            write_state(state_file, "notified_high")
+            notify_all(rc, msg)
+            tracker.set("notified_high")
             logging.info("Notified HIGH: %s", msg)
         else:
             logging.debug("HIGH already notified; skipping.")
     elif status == "Discharging" and pct <= low:
         if current_state != "notified_low":
             msg = f"Batería baja: {pct}% — conecta el cargador (umbral: {low}%)."
-            notify_send(msg)
-            notify_sound()
-            notify_telegram(token, chat, msg)
-            write_state(state_file, "notified_low")
+            notify_all(rc, msg)
+            tracker.set("notified_low")
             logging.info("Notified LOW: %s", msg)
         else:
             logging.debug("LOW already notified; skipping.")
@@ -345,32 +781,51 @@ def one_iteration(cfg: Dict[str, str], force: Optional[str] = None):
         # if within neutral range, clear state so next crossing triggers notification again
         if low < pct < high:
             if current_state != "none":
-                clear_state(state_file)
+                tracker.set("none")
                 logging.debug("In neutral range (%d%%) — state reset.", pct)
         else:
             logging.debug("No notification conditions met (%d%%, %s).", pct, status)
 
-def daemon_loop(cfg: Dict[str, str]):
-    global RUNNING
-    poll = int(cfg.get("POLL_INTERVAL", "60"))
+def daemon_loop(rc: RuntimeCfg):
+    poll = rc.poll
     logging.info("Starting daemon loop with interval %ds", poll)
     # Write pidfile
     try:
-        os.makedirs(cfg.get("STATE_DIR"), exist_ok=True)
+        os.makedirs(rc.state_dir, exist_ok=True)
         with open(PIDFILE, "w", encoding="utf-8") as f:
             f.write(str(os.getpid()))
     except Exception:
         pass
 
+    old_mask = signal.pthread_sigmask(signal.SIG_BLOCK, DAEMON_SIGNALS)
+    # Discover batteries once; rescan only when none were found yet (driver not
+    # registered at boot), when a cached device vanished, or on SIGHUP
+    reader = open_battery_reader()
+    tracker = StateTracker(rc.state_file)
     try:
-        while RUNNING:
-            one_iteration(cfg)
-            # Sleep in small increments to be responsive to signals
-            slept = 0
-            while RUNNING and slept < poll:
-                time.sleep(1)
-                slept += 1
+        while True:
+            if not reader.paths or reader.stale:
+                if reader.stale:
+                    logging.info("Battery device went away, rescanning batteries.")
+                reader.close()
+                reader = open_battery_reader(reader.paths)
+            one_iteration(rc, reader=reader, tracker=tracker)
+            deadline = time.monotonic() + poll
+            while True:
+                info = signal.sigtimedwait(DAEMON_SIGNALS, max(0.0, deadline - time.monotonic()))
+                if info is None:
+                    break  # interval elapsed
+                if info.si_signo == signal.SIGHUP:
+                    # manual override: force a rediscovery
+                    logging.info("SIGHUP received, rescanning batteries.")
+                    reader.close()
+                    reader = open_battery_reader()
+                    continue
+                logging.info("Signal %s received, shutting down.", info.si_signo)
+                return
     finally:
+        reader.close()
+        signal.pthread_sigmask(signal.SIG_SETMASK, old_mask)
         try:
             os.remove(PIDFILE)
         except Exception:
@@ -439,18 +894,26 @@ def main(argv: List[str]):
 
     setup_logging(cfg.get("LOGFILE"), verbose=verbose)
     logging.info("Config loaded from %s", env_path)
-    logging.debug("Config: %s", {k: cfg[k] for k in ("HIGH","LOW","POLL_INTERVAL","TELEGRAM_BOT_TOKEN","TELEGRAM_CHAT_ID","STATE_DIR","LOGFILE") if k in cfg})
+    if logging.root.isEnabledFor(logging.DEBUG):
+        # only build the dict when it will actually be logged
+        logging.debug("Config: %s", {k: cfg[k] for k in ("HIGH","LOW","POLL_INTERVAL","TELEGRAM_BOT_TOKEN","TELEGRAM_CHAT_ID","STATE_DIR","LOGFILE") if k in cfg})
+
+    rc = runtime_config(cfg)
 
     # Ensure state dir exists
-    os.makedirs(cfg.get("STATE_DIR"), exist_ok=True)
+    os.makedirs(rc.state_dir, exist_ok=True)
 
-    if once:
-        one_iteration(cfg, force=forced)
-        return 0
+    setup_notifiers(rc)
+    try:
+        if once:
+            one_iteration(rc, force=forced)
+            return 0
 
-    # default behavior is daemon loop unless explicitly told once
-    daemon_loop(cfg)
-    return 0
+        # default behavior is daemon loop unless explicitly told once
+        daemon_loop(rc)
+        return 0
+    finally:
+        close_notifiers()
 
 if __name__ == "__main__":
     try: